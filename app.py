@@ -7,13 +7,14 @@ Setup instructions:
 3. Run `python app.py`.
 """
 
+import asyncio
+import concurrent.futures
 import os
+import pathlib
 import sys
 import threading
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
-import openai
-import re
 
 # Import utility modules
 from file_utils import (
@@ -23,9 +24,16 @@ from file_utils import (
 from transcription_service import TranscriptionService
 from document_service import DocumentService
 
+# Chunked transcription settings
+CHUNK_SECONDS = 60
+CHUNK_OVERLAP_SECONDS = 2
+MAX_CONCURRENT_TRANSCRIPTIONS = 5
+
 # Configure OpenAI API
 def setup_api():
     """Configure OpenAI API and return success status"""
+    import openai
+
     try:
         from config import OPENAI_API_KEY
         if not OPENAI_API_KEY:
@@ -63,9 +71,25 @@ class Supernova:
         self.current_file = None
         self.current_transcript = None
         self.analysis_results = None
-        self.is_transcribing = False
         self.is_analyzing = False
-        
+        self._stream_lineno = 1
+        self._stream_tail = ""
+
+        # Shared background event loop for API work; assigned in main()
+        self.loop = None
+
+        # Bounded worker pool for blocking work scheduled off the loop, so
+        # a burst of dropped files cannot stampede the OpenAI API
+        self._pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_CONCURRENT_TRANSCRIPTIONS
+        )
+
+        # One semaphore shared by every transcription job, so total
+        # in-flight API calls stay capped no matter how many files are
+        # dropped at once (binds to the background loop on first use)
+        self._api_semaphore = asyncio.Semaphore(MAX_CONCURRENT_TRANSCRIPTIONS)
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
         # Set up UI
         self._create_ui()
     
@@ -97,7 +121,9 @@ class Supernova:
         
         filemenu.add_command(label="Open", command=self.open_file)
         filemenu.add_separator()
-        filemenu.add_command(label="Exit", command=self.root.destroy)
+        filemenu.add_command(label="Analyze (Batch)", command=self.analyze_transcript_batch)
+        filemenu.add_separator()
+        filemenu.add_command(label="Exit", command=self._on_close)
         menubar.add_cascade(label="File", menu=filemenu)
         
         self.root.config(menu=menubar)
@@ -145,6 +171,10 @@ class Supernova:
         # Analysis text area
         self.analysis_text = scrolledtext.ScrolledText(frame, height=20, width=80, wrap=tk.WORD, font=('Helvetica', 10))
         self.analysis_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        # Heading tags used while streaming analysis output
+        self.analysis_text.tag_configure("h1", font=("Helvetica", 14, "bold"))
+        self.analysis_text.tag_configure("h2", font=("Helvetica", 12, "bold"))
         
         # Export buttons frame
         export_frame = ttk.Frame(frame)
@@ -163,120 +193,274 @@ class Supernova:
     def open_file(self):
         """Open a file dialog to select an audio/video file"""
         file_path = filedialog.askopenfilename(filetypes=get_supported_filetypes())
-        if file_path and validate_file(file_path):
+        # The dialog only returns real files, so skip the existence stat
+        if file_path and validate_file(file_path, checked=True):
             self.process_file(file_path)
         elif file_path:
             messagebox.showerror("Unsupported Format", "Please select an audio or video file (mp3, wav, mp4, etc.)")
     
     def process_file(self, file_path):
-        """Process a file and start transcription"""
-        if not self.is_transcribing:
-            self.current_file = file_path
-            self.file_label.config(text=f"File: {os.path.basename(file_path)}")
-            self.status_label.config(text="Starting transcription...", foreground="blue")
-            
-            # Start transcription in a separate thread
-            self.is_transcribing = True
-            threading.Thread(target=self._transcribe_thread, args=(file_path,), daemon=True).start()
-    
-    def _transcribe_thread(self, file_path):
-        """Run transcription in a background thread"""
-        transcript, error = TranscriptionService.transcribe(file_path)
-        
+        """Queue a file for transcription"""
+        self.current_file = file_path
+        self.file_label.config(text=f"File: {os.path.basename(file_path)}")
+        self.status_label.config(text="Starting transcription...", foreground="blue")
+
+        # Schedule transcription on the shared background loop; the shared
+        # semaphore caps total in-flight API calls, so dropping several
+        # files at once simply queues their uploads
+        self._submit(self._transcribe_job(file_path))
+
+    def _submit(self, coro):
+        """Schedule a coroutine on the shared background event loop"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def _on_close(self):
+        """Shut down background workers and close the window"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.root.destroy()
+
+    async def _transcribe_job(self, file_path):
+        """Run transcription on the background loop"""
+        try:
+            transcript, error = await self._transcribe_async(file_path)
+        except Exception as e:
+            transcript, error = None, str(e)
+
+        # One scheduled callback commits everything in a single pass
+        self.root.after(0, self._on_transcribe_done, file_path, transcript, error)
+
+    def _on_transcribe_done(self, file_path, transcript, error):
+        """Commit a finished transcription to the UI in one pass"""
+        # With several files in flight, the pane (and the save-dialog
+        # default name derived from current_file) belongs to the most
+        # recently submitted file; drop results from superseded jobs so a
+        # slower earlier file can't overwrite a later one's transcript
+        if file_path != self.current_file:
+            return
+
+        self.transcript_text.delete('1.0', tk.END)
+
         if transcript:
             self.current_transcript = transcript
-            self.root.after(0, lambda: self.transcript_text.delete(1.0, tk.END))
-            self.root.after(0, lambda: self.transcript_text.insert(tk.END, transcript))
-            self.root.after(0, lambda: self.status_label.config(text="Transcription complete!", foreground="green"))
-            self.root.after(0, lambda: self.save_btn.config(state=tk.NORMAL))
-            self.root.after(0, lambda: self.analyze_btn.config(state=tk.NORMAL))
+            self.transcript_text.insert('1.0', transcript)
+            self.transcript_text.edit_reset()
+            self.transcript_text.yview_moveto(0.0)
+            self.status_label.config(text="Transcription complete!", foreground="green")
+            self.save_btn.config(state=tk.NORMAL)
+            self.analyze_btn.config(state=tk.NORMAL)
         else:
-            error_message = f"Error: {error}"
-            self.root.after(0, lambda: self.status_label.config(text=error_message, foreground="red"))
-            self.root.after(0, lambda: self.transcript_text.delete(1.0, tk.END))
-            self.root.after(0, lambda: self.transcript_text.insert(tk.END, f"Failed to transcribe file.\nError: {error}"))
-        
-        self.is_transcribing = False
-    
+            self.transcript_text.insert('1.0', f"Failed to transcribe file.\nError: {error}")
+            self.status_label.config(text=f"Error: {error}", foreground="red")
+
+    async def _transcribe_async(self, file_path):
+        """Transcribe a file by splitting it into overlapping chunks and
+        dispatching them concurrently, bounded by a semaphore"""
+        # Slicing decodes and re-encodes the whole file; run it on the
+        # loop's executor so other submitted jobs aren't blocked behind it
+        chunks = await asyncio.to_thread(
+            TranscriptionService.split_audio, file_path, CHUNK_SECONDS, CHUNK_OVERLAP_SECONDS
+        )
+        if not chunks:
+            # Short file, or chunking unavailable - single round-trip
+            async with self._api_semaphore:
+                return await TranscriptionService.atranscribe(file_path)
+
+        async def transcribe_with_limit(chunk):
+            async with self._api_semaphore:
+                return await TranscriptionService.atranscribe_chunk(chunk)
+
+        results = await asyncio.gather(
+            *(transcribe_with_limit(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+
+        # Collect chunk transcripts in order, failing on the first error
+        texts = []
+        for result in results:
+            if isinstance(result, BaseException):
+                return None, str(result)
+            text, error = result
+            if text is None:
+                return None, error
+            texts.append(text)
+
+        return TranscriptionService.merge_chunk_texts(texts), ""
+
     def analyze_transcript(self):
         """Analyze the transcript using OpenAI ChatCompletion API"""
+        if self.is_analyzing:
+            messagebox.showinfo("Analysis Running", "An analysis is already in progress. Please wait for it to finish.")
+            return
         if not self.current_transcript:
             messagebox.showerror("No Transcript", "No transcript to analyze. Please transcribe a file first.")
             return
-        
+
         self.is_analyzing = True
         self.status_label.config(text="Analyzing transcript...", foreground="orange")
         self.analyze_btn.config(state=tk.DISABLED)
         self.export_word_btn.config(state=tk.DISABLED)
         self.export_pdf_btn.config(state=tk.DISABLED)
         
-        # Create a thread for analysis
-        threading.Thread(target=self._analyze_thread, daemon=True).start()
-    
-    def _analyze_thread(self):
-        """Run analysis in a background thread"""
-        results, error = TranscriptionService.analyze(self.current_transcript, PROMPT_FILE)
-        
+        # Schedule analysis on the shared background loop
+        self._submit(self._analyze_job())
+
+    async def _analyze_job(self):
+        """Run analysis on the background loop"""
+        # The streaming consumer blocks on the network, so run it on the
+        # loop's executor rather than the loop itself
+        await asyncio.to_thread(self._run_analysis)
+
+    def _run_analysis(self):
+        """Consume the analysis stream, posting output to the UI"""
+        self.root.after(0, self._begin_analysis_stream)
+
+        try:
+            cached = TranscriptionService.get_cached_analysis(self.current_transcript, PROMPT_FILE)
+            if cached is not None:
+                # Cache hit: show the stored analysis without an API call
+                self.root.after(0, self._append_analysis_chunk, cached)
+                analysis = cached
+            else:
+                analysis_parts = []
+                for chunk in TranscriptionService.analyze_stream(self.current_transcript, PROMPT_FILE):
+                    analysis_parts.append(chunk)
+                    self.root.after(0, self._append_analysis_chunk, chunk)
+                analysis = ''.join(analysis_parts)
+                TranscriptionService.store_cached_analysis(self.current_transcript, PROMPT_FILE, analysis)
+            results = TranscriptionService.build_results(analysis)
+            error = ""
+        except Exception as e:
+            results, error = None, str(e)
+
+        # One scheduled callback commits everything in a single pass
+        self.root.after(0, self._apply_analysis_result, results, error)
+
+    def _apply_analysis_result(self, results, error):
+        """Commit a finished analysis to the UI in one pass"""
+        # Cleared here, on the Tk thread, so the flag can't drop while
+        # the final UI update is still queued
+        self.is_analyzing = False
+
         if results:
             self.analysis_results = results
-            self.root.after(0, lambda: self._update_analysis_ui())
+            self._update_analysis_ui()
         else:
-            error_message = f"Analysis error: {error}"
-            self.root.after(0, lambda: self.status_label.config(text=error_message, foreground="red"))
-        
+            self.status_label.config(text=f"Analysis error: {error}", foreground="red")
+
+        self.analyze_btn.config(state=tk.NORMAL)
+
+    def analyze_transcript_batch(self):
+        """Analyze the transcript via OpenAI's Batch API (roughly half the
+        cost of an interactive call, but completion can take a while)"""
+        # Both analysis paths stream into the same widget and share the
+        # _stream_lineno/_stream_tail bookkeeping, so never run two at once
+        if self.is_analyzing:
+            messagebox.showinfo("Analysis Running", "An analysis is already in progress. Please wait for it to finish.")
+            return
+        if not self.current_transcript:
+            messagebox.showerror("No Transcript", "No transcript to analyze. Please transcribe a file first.")
+            return
+
+        self.is_analyzing = True
+        self.status_label.config(text="Batch analysis submitted; this may take a while...", foreground="orange")
+        self.analyze_btn.config(state=tk.DISABLED)
+        self.export_word_btn.config(state=tk.DISABLED)
+        self.export_pdf_btn.config(state=tk.DISABLED)
+
+        # Schedule the batch job on the shared background loop
+        self._submit(self._analyze_batch_job(self.current_transcript))
+
+    async def _analyze_batch_job(self, transcript):
+        """Run a batch analysis on the loop's executor; analyze_batch
+        blocks while polling for completion"""
+        try:
+            analyses, error = await asyncio.to_thread(
+                TranscriptionService.analyze_batch, [transcript], PROMPT_FILE
+            )
+            if analyses:
+                results = TranscriptionService.build_results(analyses[0])
+                error = ""
+            else:
+                results = None
+        except Exception as e:
+            # An escaped exception would be swallowed with the discarded
+            # future and leave the UI stuck; report it instead
+            results, error = None, str(e)
+
+        self.root.after(0, self._on_batch_analysis_done, results, error)
+
+    def _on_batch_analysis_done(self, results, error):
+        """Commit a finished batch analysis to the UI in one pass"""
         self.is_analyzing = False
-        self.root.after(0, lambda: self.analyze_btn.config(state=tk.NORMAL))
-    
-    def _update_analysis_ui(self):
-        """Update UI with analysis results"""
-        # Update analysis text
+
+        if results:
+            self.analysis_results = results
+            # Reuse the streaming pipeline to render and tag the text
+            self._begin_analysis_stream()
+            self._append_analysis_chunk(results.get('full_analysis', ''))
+            self._update_analysis_ui()
+        else:
+            self.status_label.config(text=f"Batch analysis error: {error}", foreground="red")
+
+        self.analyze_btn.config(state=tk.NORMAL)
+
+    def _begin_analysis_stream(self):
+        """Prepare the analysis tab to receive streamed output"""
         self.analysis_text.delete(1.0, tk.END)
-        self.analysis_text.insert(tk.END, self.analysis_results.get('full_analysis', ''))
-        
-        # Apply formatting
-        self._apply_text_formatting()
-        
+        self._stream_lineno = 1
+        self._stream_tail = ""
+        self.main_notebook.select(1)
+
+    def _append_analysis_chunk(self, chunk):
+        """Append a streamed chunk, tagging each line as it completes"""
+        self.analysis_text.insert(tk.END, chunk)
+
+        # Classify completed lines from the Python-side buffer so we never
+        # have to read text back out of the widget
+        lines = (self._stream_tail + chunk).split('\n')
+        self._stream_tail = lines.pop()
+        for line in lines:
+            self._record_heading(self._stream_lineno, line)
+            self._stream_lineno += 1
+
+        self.analysis_text.see(tk.END)
+
+    def _record_heading(self, lineno, line):
+        """Tag a completed line if it is a heading"""
+        if line.startswith('### '):
+            self.analysis_text.tag_add("h2", f"{lineno}.0", f"{lineno}.end")
+        elif line.startswith('## '):
+            self.analysis_text.tag_add("h1", f"{lineno}.0", f"{lineno}.end")
+
+    def _update_analysis_ui(self):
+        """Finalize the UI after a streamed analysis completes"""
+        # The last streamed line has no trailing newline, so tag it here
+        self._record_heading(self._stream_lineno, self._stream_tail)
+
         # Update status and enable export buttons
         self.status_label.config(text="Analysis complete!", foreground="green")
         self.export_word_btn.config(state=tk.NORMAL)
         self.export_pdf_btn.config(state=tk.NORMAL)
-        
-        # Switch to Analysis tab
-        self.main_notebook.select(1)
-    
-    def _apply_text_formatting(self):
-        """Apply basic formatting to the analysis text"""
-        # Define tags
-        self.analysis_text.tag_configure("h1", font=("Helvetica", 14, "bold"))
-        self.analysis_text.tag_configure("h2", font=("Helvetica", 12, "bold"))
-        
-        # Apply formatting to headings
-        content = self.analysis_text.get(1.0, tk.END)
-        
-        # Find all occurrences of h1 headings (##)
-        for match in re.finditer(r'^## (.+)$', content, re.MULTILINE):
-            start_idx = f"1.0 + {match.start()} chars"
-            end_idx = f"1.0 + {match.end()} chars"
-            self.analysis_text.tag_add("h1", start_idx, end_idx)
-        
-        # Find all occurrences of h2 headings (###)
-        for match in re.finditer(r'^### (.+)$', content, re.MULTILINE):
-            start_idx = f"1.0 + {match.start()} chars"
-            end_idx = f"1.0 + {match.end()} chars"
-            self.analysis_text.tag_add("h2", start_idx, end_idx)
     
+    def _default_output(self, suffix):
+        """Build the default save location for the current file
+
+        Parses the current file path once instead of separate splitext/
+        basename/dirname calls in every save handler.
+        """
+        path = pathlib.Path(self.current_file)
+        return str(path.parent), f"{path.stem}{suffix}"
+
     def save_transcript(self):
         """Save the transcript to a text file"""
         if not self.current_file or not self.current_transcript:
             return
-            
-        # Generate output file path
-        default_path = os.path.splitext(self.current_file)[0] + '.txt'
-        
+
         # Ask user for save location
+        initial_dir, initial_file = self._default_output('.txt')
         output_path = filedialog.asksaveasfilename(
-            initialdir=os.path.dirname(self.current_file),
-            initialfile=os.path.basename(default_path),
+            initialdir=initial_dir,
+            initialfile=initial_file,
             defaultextension=".txt",
             filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")]
         )
@@ -299,33 +483,19 @@ class Supernova:
             messagebox.showerror("Error", "Nothing to export. Please complete transcription and analysis first.")
             return
         
-        # Generate output file path
-        base_output_path = os.path.splitext(self.current_file)[0]
-        default_filename = f"{os.path.basename(base_output_path)}_analysis.docx"
-        
         # Ask user for output file location
+        initial_dir, initial_file = self._default_output('_analysis.docx')
         output_path = filedialog.asksaveasfilename(
-            initialdir=os.path.dirname(self.current_file),
-            initialfile=default_filename,
+            initialdir=initial_dir,
+            initialfile=initial_file,
             defaultextension=".docx",
             filetypes=[("Word Documents", "*.docx"), ("All Files", "*.*")]
         )
         
         if not output_path:
             return  # User cancelled
-        
-        success, error = DocumentService.export_word(
-            self.current_transcript, 
-            self.analysis_results.get('full_analysis', ''),
-            output_path
-        )
-        
-        if success:
-            self.status_label.config(text=f'Word document saved to: {output_path}', foreground="green")
-            messagebox.showinfo("Success", f'Word document saved successfully to:\n{output_path}')
-        else:
-            self.status_label.config(text=f'Error exporting to Word: {error}', foreground="red")
-            messagebox.showerror("Error", f'Failed to export to Word:\n{error}')
+
+        self._start_export(DocumentService.export_word, output_path, "Word")
     
     def export_to_pdf(self):
         """Export transcript and analysis to a PDF document"""
@@ -333,33 +503,48 @@ class Supernova:
             messagebox.showerror("Error", "Nothing to export. Please complete transcription and analysis first.")
             return
         
-        # Generate output file path
-        base_output_path = os.path.splitext(self.current_file)[0]
-        default_filename = f"{os.path.basename(base_output_path)}_analysis.pdf"
-        
         # Ask user for output file location
+        initial_dir, initial_file = self._default_output('_analysis.pdf')
         output_path = filedialog.asksaveasfilename(
-            initialdir=os.path.dirname(self.current_file),
-            initialfile=default_filename,
+            initialdir=initial_dir,
+            initialfile=initial_file,
             defaultextension=".pdf",
             filetypes=[("PDF Documents", "*.pdf"), ("All Files", "*.*")]
         )
         
         if not output_path:
             return  # User cancelled
-        
-        success, error = DocumentService.export_pdf(
-            self.current_transcript, 
+
+        self._start_export(DocumentService.export_pdf, output_path, "PDF")
+
+    def _start_export(self, export_func, output_path, kind):
+        """Kick off an export on a worker so the UI stays responsive"""
+        self.export_word_btn.config(state=tk.DISABLED)
+        self.export_pdf_btn.config(state=tk.DISABLED)
+        self.status_label.config(text=f"Exporting {kind} document...", foreground="orange")
+        self._submit(self._export_job(export_func, output_path, kind))
+
+    async def _export_job(self, export_func, output_path, kind):
+        """Run a document export off the main thread"""
+        success, error = await asyncio.to_thread(
+            export_func,
+            self.current_transcript,
             self.analysis_results.get('full_analysis', ''),
             output_path
         )
-        
+        self.root.after(0, self._on_export_done, success, error, output_path, kind)
+
+    def _on_export_done(self, success, error, output_path, kind):
+        """Report an export result and re-enable the export buttons"""
+        self.export_word_btn.config(state=tk.NORMAL)
+        self.export_pdf_btn.config(state=tk.NORMAL)
+
         if success:
-            self.status_label.config(text=f'PDF document saved to: {output_path}', foreground="green")
-            messagebox.showinfo("Success", f'PDF document saved successfully to:\n{output_path}')
+            self.status_label.config(text=f'{kind} document saved to: {output_path}', foreground="green")
+            messagebox.showinfo("Success", f'{kind} document saved successfully to:\n{output_path}')
         else:
-            self.status_label.config(text=f'Error exporting to PDF: {error}', foreground="red")
-            messagebox.showerror("Error", f'Failed to export to PDF:\n{error}')
+            self.status_label.config(text=f'Error exporting to {kind}: {error}', foreground="red")
+            messagebox.showerror("Error", f'Failed to export to {kind}:\n{error}')
     
     def edit_analysis_prompt(self):
         """Open the analysis prompt file in the default text editor"""
@@ -384,7 +569,9 @@ class Supernova:
         
         # Clear analysis tab
         self.analysis_text.delete(1.0, tk.END)
-        
+        self._stream_lineno = 1
+        self._stream_tail = ""
+
         # Disable export buttons
         self.export_word_btn.config(state=tk.DISABLED)
         self.export_pdf_btn.config(state=tk.DISABLED)
@@ -396,21 +583,25 @@ class Supernova:
 
 def setup_dragdrop(root, app):
     """Set up drag and drop support if available"""
+    def process_all(paths):
+        for path in paths:
+            app.process_file(path)
+
     try:
-        # Try with TkDnD
+        # Try with TkDnD; the drop data is a Tcl list of paths
         root.tk.eval('package require tkdnd')
         root.tk.call('tkdnd::drop_target', root, {
-            'DND_Files': lambda e, data: app.process_file(data),
+            'DND_Files': lambda e, data: process_all(root.tk.splitlist(data)),
             'DND_Text': lambda e, data: None  # Not handling text drops
         })
         return True
-    except:
-        # Try with windnd for Windows
+    except tk.TclError:
+        # tkdnd not installed; try with windnd for Windows
         try:
             import windnd
-            windnd.hook_dropfiles(root, func=lambda files: app.process_file(files[0].decode('utf-8')))
+            windnd.hook_dropfiles(root, func=lambda files: process_all(f.decode('utf-8') for f in files))
             return True
-        except:
+        except Exception:
             return False
 
 def main():
@@ -425,7 +616,14 @@ def main():
     # Initialize the app
     root = tk.Tk()
     app = Supernova(root)
-    
+
+    # Start a single background event loop shared by all API work; blocking
+    # calls made via asyncio.to_thread run on the app's bounded pool
+    loop = asyncio.new_event_loop()
+    loop.set_default_executor(app._pool)
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    app.loop = loop
+
     # Try to set up drag-and-drop
     try:
         setup_dragdrop(root, app)
@@ -2,13 +2,12 @@
 This module handles document generation and export functionality.
 """
 
+import functools
 import os
 from datetime import datetime
-import docx
-from docx.shared import Pt
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+# docx and reportlab are imported lazily inside the export methods; they
+# cost hundreds of ms at import time and many sessions never export
 
 class DocumentService:
     """
@@ -27,13 +26,65 @@ class DocumentService:
         Returns:
             tuple: (success, error_message)
         """
+        tmp_path = file_path + ".tmp"
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
+            # Write to a temp file with a 1 MiB buffer, then swap it into
+            # place so a crash never leaves a half-written file behind
+            with open(tmp_path, 'w', encoding='utf-8', buffering=1024 * 1024, newline='') as f:
                 f.write(content)
+            os.replace(tmp_path, file_path)
             return True, ""
         except Exception as e:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
             return False, str(e)
     
+    @staticmethod
+    @functools.lru_cache(maxsize=4)
+    def _parse_markdown(analysis):
+        """
+        Parse analysis text into a list of (kind, text) blocks
+
+        Kinds are 'h2', 'h3', 'bullet', 'para' and 'blank'. Markdown
+        prefixes are stripped here once so both exporters can render the
+        same blocks without re-scanning the text. Consecutive prose lines
+        are coalesced into a single newline-joined 'para' block and runs of
+        empty lines collapse to one 'blank'. Results are memoized so the
+        common "export both formats" flow parses only once.
+
+        Args:
+            analysis (str): The analysis text in Markdown-like format
+
+        Returns:
+            list: List of (kind, text) tuples
+        """
+        blocks = []
+        para_lines = []
+
+        def flush_para():
+            if para_lines:
+                blocks.append(('para', '\n'.join(para_lines)))
+                para_lines.clear()
+
+        for line in analysis.split('\n'):
+            if line.startswith('## '):
+                flush_para()
+                blocks.append(('h2', line[3:]))
+            elif line.startswith('### '):
+                flush_para()
+                blocks.append(('h3', line[4:]))
+            elif line.strip().startswith('- '):
+                flush_para()
+                blocks.append(('bullet', line.strip()[2:]))
+            elif line.strip():
+                para_lines.append(line)
+            else:
+                flush_para()
+                if blocks and blocks[-1][0] != 'blank':
+                    blocks.append(('blank', ''))
+        flush_para()
+        return blocks
+
     @staticmethod
     def export_word(transcript, analysis, output_path):
         """
@@ -48,6 +99,9 @@ class DocumentService:
             tuple: (success, error_message)
         """
         try:
+            import docx
+            from docx.shared import Pt
+
             # Create a new document
             doc = docx.Document()
             
@@ -68,33 +122,17 @@ class DocumentService:
             # Add analysis section
             doc.add_heading('Analysis', 1)
             
-            # Process full analysis content with Markdown-like formatting
-            analysis_lines = analysis.split('\n')
-            
-            current_paragraph = None
-            
-            for line in analysis_lines:
-                # Handle level 2 headers (##)
-                if line.startswith('## '):
-                    doc.add_heading(line.replace('## ', ''), 2)
-                
-                # Handle level 3 headers (###)
-                elif line.startswith('### '):
-                    doc.add_heading(line.replace('### ', ''), 3)
-                
-                # Handle bullet points
-                elif line.strip().startswith('- '):
-                    bullet_text = line.strip().replace('- ', '', 1)
-                    doc.add_paragraph(bullet_text, style='List Bullet')
-                
-                # Regular paragraphs or empty lines
-                elif not line.strip():
-                    current_paragraph = None  # Start a new paragraph after empty line
-                else:
-                    if current_paragraph is None:
-                        current_paragraph = doc.add_paragraph(line)
-                    else:
-                        current_paragraph.add_run('\n' + line)
+            # Render the pre-parsed analysis blocks; prose arrives already
+            # coalesced, so each block is exactly one paragraph
+            for kind, text in DocumentService._parse_markdown(analysis):
+                if kind == 'h2':
+                    doc.add_heading(text, 2)
+                elif kind == 'h3':
+                    doc.add_heading(text, 3)
+                elif kind == 'bullet':
+                    doc.add_paragraph(text, style='List Bullet')
+                elif kind == 'para':
+                    doc.add_paragraph(text)
             
             # Save the document
             doc.save(output_path)
@@ -117,8 +155,16 @@ class DocumentService:
             tuple: (success, error_message)
         """
         try:
-            # Create a PDF document
-            doc = SimpleDocTemplate(output_path, pagesize=letter)
+            import io
+            from reportlab.lib.pagesizes import letter
+            from reportlab.platypus import (
+                SimpleDocTemplate, Paragraph, Spacer, ListFlowable, ListItem
+            )
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+            # Build into memory first; the file is written atomically below
+            buffer = io.BytesIO()
+            doc = SimpleDocTemplate(buffer, pagesize=letter)
             styles = getSampleStyleSheet()
             
             # Create custom styles
@@ -163,56 +209,61 @@ class DocumentService:
             elements.append(Paragraph('Analysis', heading1_style))
             elements.append(Spacer(1, 12))
             
-            # Process full analysis content with Markdown-like formatting
-            analysis_lines = analysis.split('\n')
-            current_text = ""
-            
-            for line in analysis_lines:
-                # Handle level 2 headers (##)
-                if line.startswith('## '):
-                    if current_text:
-                        elements.append(Paragraph(current_text, normal_style))
-                        current_text = ""
+            # Render the pre-parsed analysis blocks, coalescing consecutive
+            # bullets into one ListFlowable instead of one flowable each
+            current_bullets = []
+            prev_kind = None
+
+            def flush_bullets():
+                if current_bullets:
+                    elements.append(ListFlowable(
+                        [ListItem(p) for p in current_bullets],
+                        bulletType='bullet'
+                    ))
+                    current_bullets.clear()
+
+            for kind, text in DocumentService._parse_markdown(analysis):
+                if kind == 'h2':
+                    flush_bullets()
                     elements.append(Spacer(1, 8))
-                    elements.append(Paragraph(line.replace('## ', ''), heading2_style))
+                    elements.append(Paragraph(text, heading2_style))
                     elements.append(Spacer(1, 4))
-                
-                # Handle level 3 headers (###)
-                elif line.startswith('### '):
-                    if current_text:
-                        elements.append(Paragraph(current_text, normal_style))
-                        current_text = ""
+
+                elif kind == 'h3':
+                    flush_bullets()
                     elements.append(Spacer(1, 6))
-                    elements.append(Paragraph(line.replace('### ', ''), heading3_style))
+                    elements.append(Paragraph(text, heading3_style))
                     elements.append(Spacer(1, 3))
-                
-                # Handle bullet points
-                elif line.strip().startswith('- '):
-                    if current_text:
-                        elements.append(Paragraph(current_text, normal_style))
-                        current_text = ""
-                    bullet_text = line.strip().replace('- ', '', 1)
-                    elements.append(Paragraph(f"• {bullet_text}", bullet_style))
-                
-                # Regular paragraphs
-                elif line.strip():
-                    if current_text:
-                        current_text += "<br />"
-                    current_text += line
-                
-                # Empty lines
-                elif current_text:
-                    elements.append(Paragraph(current_text, normal_style))
-                    current_text = ""
+
+                elif kind == 'bullet':
+                    current_bullets.append(Paragraph(text, bullet_style))
+
+                elif kind == 'para':
+                    flush_bullets()
+                    elements.append(Paragraph(text.replace('\n', '<br />'), normal_style))
+
+                # Blank lines separate paragraphs
+                elif prev_kind == 'para':
                     elements.append(Spacer(1, 6))
-            
-            # Add any remaining text
-            if current_text:
-                elements.append(Paragraph(current_text, normal_style))
-            
-            # Build the PDF document
+
+                prev_kind = kind
+
+            flush_bullets()
+
+            # Build the PDF in memory, then swap it into place so a crash
+            # mid-build never leaves a truncated file at output_path
             doc.build(elements)
+            tmp_path = output_path + ".tmp"
+            try:
+                with open(tmp_path, 'wb') as f:
+                    f.write(buffer.getvalue())
+                os.replace(tmp_path, output_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+
             return True, ""
-            
+
         except Exception as e:
-            return False, str(e) 
\ No newline at end of file
+            return False, str(e)
\ No newline at end of file
@@ -6,38 +6,47 @@ import os
 import mimetypes
 
 # Constants
-SUPPORTED_MIMETYPES = [
-    'audio/mpeg', 'audio/mp3', 'audio/wav', 'audio/x-wav', 
+SUPPORTED_MIMETYPES = frozenset({
+    'audio/mpeg', 'audio/mp3', 'audio/wav', 'audio/x-wav',
     'audio/x-m4a', 'audio/mp4', 'video/mp4', 'video/mpeg'
-]
-SUPPORTED_EXTENSIONS = ['.mp3', '.wav', '.mp4', '.m4a', '.mpeg', '.mpga']
+})
+SUPPORTED_MIME_PREFIXES = tuple(SUPPORTED_MIMETYPES)
+AUDIO_EXTENSIONS = frozenset({'.mp3', '.wav', '.m4a', '.mpga'})
+VIDEO_EXTENSIONS = frozenset({'.mp4', '.mpeg'})
+SUPPORTED_EXTENSIONS = AUDIO_EXTENSIONS | VIDEO_EXTENSIONS
+
+# File dialog filter list, built once from the extension sets above
+_SUPPORTED_FILETYPES = (
+    ("Audio Files", ' '.join('*' + ext for ext in sorted(AUDIO_EXTENSIONS))),
+    ("Video Files", ' '.join('*' + ext for ext in sorted(VIDEO_EXTENSIONS))),
+    ("All Files", "*.*")
+)
 PROMPT_DIR = "prompts"
 PROMPT_FILE = os.path.join(PROMPT_DIR, "analysis_prompt.txt")
 
-def validate_file(file_path):
+def validate_file(file_path, checked=False):
     """
     Check if file is a supported audio/video format
-    
+
     Args:
         file_path (str): Path to the file to validate
-        
+        checked (bool): Skip the existence stat when the caller already
+            knows the path is a real file (e.g. a file dialog selection)
+
     Returns:
         bool: True if the file is supported, False otherwise
     """
-    if not os.path.isfile(file_path):
+    if not checked and not os.path.isfile(file_path):
         return False
-        
-    # Check extension
+
+    # Check extension first; the common case never touches mimetypes
     file_ext = os.path.splitext(file_path)[1].lower()
     if file_ext in SUPPORTED_EXTENSIONS:
         return True
-        
-    # Check mimetype
+
+    # Fall back to mimetype (str.startswith accepts a tuple of prefixes)
     mime_type, _ = mimetypes.guess_type(file_path)
-    if mime_type and any(mime_type.startswith(t) for t in SUPPORTED_MIMETYPES):
-        return True
-        
-    return False
+    return bool(mime_type) and mime_type.startswith(SUPPORTED_MIME_PREFIXES)
 
 def setup_prompt_files():
     """
@@ -91,13 +100,9 @@ TRANSCRIPT:
 
 def get_supported_filetypes():
     """
-    Get a list of supported file types for file dialogs
-    
+    Get the supported file types for file dialogs
+
     Returns:
-        list: List of tuples (description, extensions)
+        tuple: Tuple of (description, patterns) pairs, shared across calls
     """
-    return [
-        ("Audio Files", "*.mp3 *.wav *.m4a *.mpga"),
-        ("Video Files", "*.mp4 *.mpeg"),
-        ("All Files", "*.*")
-    ] 
\ No newline at end of file
+    return _SUPPORTED_FILETYPES 
\ No newline at end of file